@@ -1,25 +1,29 @@
 """All the flask api endpoints."""
-import csv
 import functools
 import logging
+import math
 import re
 import typing as T
-from collections import Counter
 from pathlib import Path
 
+import numpy as np  # type: ignore
+import orjson
 import pandas as pd  # type: ignore
 import peewee as pw
 import typing_extensions as TT
 from flask import current_app
 from flask import Flask
 from flask import has_app_context
+from flask import make_response
+from flask import request
 from flask import Response
 from flask import send_file
+from flask_compress import Compress  # type: ignore
 from flask_restful import Api  # type: ignore
 from flask_restful import reqparse
 from flask_restful import Resource
 from playhouse.flask_utils import get_object_or_404
-from sklearn import model_selection  # type: ignore
+from playhouse.pool import PooledSqliteDatabase
 from typing_extensions import TypedDict
 from werkzeug.datastructures import FileStorage
 from werkzeug.exceptions import BadRequest
@@ -41,20 +45,19 @@ API_URL_PREFIX = "/api"
 logger = logging.getLogger(__name__)
 
 
-class HasReqParseProtocol(TT.Protocol):
-    reqparse: reqparse.RequestParser
-
-
 class SupportSpreadsheetFileType(object):
-    def __init__(self: HasReqParseProtocol) -> None:
-        super().__init__()  # type: ignore[misc]
+    @staticmethod
+    def _add_file_type_argument(
+        parser: reqparse.RequestParser,
+    ) -> reqparse.RequestParser:
         choices = [
             file_type.strip(".")
             for file_type in Settings.SUPPORTED_NON_CSV_FORMATS | {".csv"}
         ]
-        self.reqparse.add_argument(
+        parser.add_argument(
             "file_type", type=str, choices=choices, location="args", default="xlsx"
         )
+        return parser
 
     def _get_cached_version_with_file_type(
         self, file_path: Path, file_type: TT.Literal[".xlsx", ".xls", ".csv"]
@@ -114,13 +117,17 @@ class BaseResource(Resource):
 
     @staticmethod
     def _write_headers_and_data_to_csv(
-        headers: T.List[str], data: T.List[T.List[str]], csvfile: Path
+        headers: T.List[str], df: pd.DataFrame, csvfile: Path,
     ) -> None:
+        """Write df to csvfile, using headers as the header row.
 
+        Args:
+            headers: The header row. Must have one entry per column of df.
+            df: The data, without a header row.
+            csvfile: Where to write.
+        """
         with csvfile.open("w") as f:
-            writer = csv.writer(f)
-            writer.writerow(headers)
-            writer.writerows(data)
+            df.to_csv(f, header=headers, index=False)
 
     @staticmethod
     def _validate_serializable_list_value(val: T.Any) -> str:
@@ -139,6 +146,13 @@ class BaseResource(Resource):
         else:
             raise ValueError("Not a valid email.")
 
+    @staticmethod
+    def _validate_greater_than_1(val: T.Any) -> int:
+        int_val = int(val)
+        if int_val <= 1:
+            raise ValueError("Must be greater than 1")
+        return int_val
+
 
 class ClassifierStatusJson(TypedDict):
     classifier_id: int
@@ -153,6 +167,34 @@ class ClassifierStatusJson(TypedDict):
 class ClassifierRelatedResource(BaseResource):
     """Base class to define utility functions related to classifiers."""
 
+    @staticmethod
+    def _classifiers_with_sets() -> pw.ModelSelect:
+        """Select classifiers, along with everything _classifier_status() looks at.
+
+        Joining here means that _classifier_status() doesn't have to do a query for
+        train_set, dev_set and dev_set.metrics for every classifier.
+        """
+        TrainSet = models.LabeledSet.alias()
+        DevSet = models.LabeledSet.alias()
+        DevSetMetrics = models.ClassifierMetrics.alias()
+        return (
+            models.Classifier.select(models.Classifier, TrainSet, DevSet, DevSetMetrics)
+            .join(
+                TrainSet,
+                pw.JOIN.LEFT_OUTER,
+                on=(models.Classifier.train_set == TrainSet.id_),
+            )
+            .switch(models.Classifier)
+            .join(
+                DevSet, pw.JOIN.LEFT_OUTER, on=(models.Classifier.dev_set == DevSet.id_)
+            )
+            .join(
+                DevSetMetrics,
+                pw.JOIN.LEFT_OUTER,
+                on=(DevSet.metrics == DevSetMetrics.id),
+            )
+        )
+
     @staticmethod
     def _classifier_status(clsf: models.Classifier) -> ClassifierStatusJson:
         """Process a Classifier instance and format it into the API spec."""
@@ -199,7 +241,8 @@ class OneClassifier(ClassifierRelatedResource):
 
     def get(self, classifier_id: int) -> ClassifierStatusJson:
         clsf = get_object_or_404(
-            models.Classifier, models.Classifier.classifier_id == classifier_id
+            self._classifiers_with_sets(),
+            models.Classifier.classifier_id == classifier_id,
         )
         return self._classifier_status(clsf)
 
@@ -209,27 +252,25 @@ class Classifiers(ClassifierRelatedResource):
 
     url = "/classifiers/"
 
-    def __init__(self) -> None:
-        """Set up request parser."""
-        self.reqparse = reqparse.RequestParser()
-        self.reqparse.add_argument(
-            name="name", type=str, required=True, location="json"
-        )
-        self.reqparse.add_argument(
-            name="notify_at_email",
-            type=self._validate_email,
-            required=True,
-            location="json",
-            help="The email address provided must be a valid email address.",
-        )
-        self.reqparse.add_argument(
-            name="category_names",
-            type=self._validate_serializable_list_value,
-            action="append",
-            required=True,
-            location="json",
-            help="The category names must be a list of strings that don't contain commas within them..",
-        )
+    # Flask-RESTful instantiates a resource for every request, so the request parser
+    # is set up once here, instead of in __init__.
+    reqparse = reqparse.RequestParser()
+    reqparse.add_argument(name="name", type=str, required=True, location="json")
+    reqparse.add_argument(
+        name="notify_at_email",
+        type=BaseResource._validate_email,
+        required=True,
+        location="json",
+        help="The email address provided must be a valid email address.",
+    )
+    reqparse.add_argument(
+        name="category_names",
+        type=BaseResource._validate_serializable_list_value,
+        action="append",
+        required=True,
+        location="json",
+        help="The category names must be a list of strings that don't contain commas within them..",
+    )
 
     def post(self) -> ClassifierStatusJson:
         """Create a classifier."""
@@ -249,7 +290,7 @@ class Classifiers(ClassifierRelatedResource):
 
     def get(self) -> T.List[ClassifierStatusJson]:
         """Get a list of classifiers."""
-        res = [self._classifier_status(clsf) for clsf in models.Classifier.select()]
+        res = [self._classifier_status(clsf) for clsf in self._classifiers_with_sets()]
         return res
 
 
@@ -258,12 +299,12 @@ class ClassifiersTrainingFile(ClassifierRelatedResource):
 
     url = "/classifiers/<int:classifier_id>/training/file"
 
-    def __init__(self) -> None:
-        """Set up request parser."""
-        self.reqparse = reqparse.RequestParser()
-        self.reqparse.add_argument(
-            name="file", type=FileStorage, required=True, location="files"
-        )
+    reqparse = reqparse.RequestParser()
+    # werkzeug already spools uploaded files larger than 500KB to a temporary file
+    # on disk, so uploads need no special handling to keep memory usage down.
+    reqparse.add_argument(
+        name="file", type=FileStorage, required=True, location="files"
+    )
 
     def post(self, classifier_id: int) -> ClassifierStatusJson:
         """Upload a training set for classifier, and start training.
@@ -289,33 +330,26 @@ class ClassifiersTrainingFile(ClassifierRelatedResource):
         if classifier.train_set is not None:
             raise AlreadyExists("This classifier already has a training set.")
 
-        table_headers, table_data = self._validate_training_file_and_get_data(
+        table_headers, table_df = self._validate_training_file_and_get_data(
             classifier.category_names, file_
         )
         file_.close()
-        # Split into train and dev
-        ss = model_selection.StratifiedShuffleSplit(n_splits=1, test_size=0.2)
-        X, y = zip(*table_data)
-        train_indices, dev_indices = next(ss.split(X, y))
-
-        train_data = [table_data[i] for i in train_indices]
-        dev_data = [table_data[i] for i in dev_indices]
-
-        train_file = utils.Files.classifier_train_set_file(classifier_id)
-        self._write_headers_and_data_to_csv(table_headers, train_data, train_file)
-        dev_file = utils.Files.classifier_dev_set_file(classifier_id)
-        self._write_headers_and_data_to_csv(table_headers, dev_data, dev_file)
-
-        classifier.train_set = models.LabeledSet()
-        classifier.dev_set = models.LabeledSet()
-        classifier.train_set.save()
-        classifier.dev_set.save()
-        classifier.save()
-
-        # Refresh classifier
-        classifier = models.Classifier.get(
-            models.Classifier.classifier_id == classifier_id
-        )
+        # The split into train and dev is done by the worker, before training.
+        labeled_file = utils.Files.classifier_labeled_set_file(classifier_id)
+        self._write_headers_and_data_to_csv(table_headers, table_df, labeled_file)
+
+        # The LabeledSets are not created with one insert_many(), because getting
+        # both primary keys back needs a RETURNING clause, which peewee doesn't
+        # support for SQLite.
+        with models.database_proxy.atomic():
+            classifier.train_set = models.LabeledSet()
+            classifier.dev_set = models.LabeledSet()
+            classifier.train_set.save()
+            classifier.dev_set.save()
+            # Only the foreign keys changed.
+            classifier.save(
+                only=[models.Classifier.train_set, models.Classifier.dev_set]
+            )
 
         queue_manager: QueueManager = current_app.queue_manager
 
@@ -325,6 +359,7 @@ class ClassifiersTrainingFile(ClassifierRelatedResource):
             classifier_id=classifier.classifier_id,
             labels=classifier.category_names,
             model_path=Settings.TRANSFORMERS_MODEL,
+            labeled_file=str(labeled_file),
             train_file=str(utils.Files.classifier_train_set_file(classifier_id)),
             dev_file=str(utils.Files.classifier_dev_set_file(classifier_id)),
             cache_dir=str(Settings.TRANSFORMERS_CACHE_DIRECTORY),
@@ -338,7 +373,7 @@ class ClassifiersTrainingFile(ClassifierRelatedResource):
     @staticmethod
     def _validate_training_file_and_get_data(
         category_names: T.List[str], file_: FileStorage
-    ) -> T.Tuple[T.List[str], T.List[T.List[str]]]:
+    ) -> T.Tuple[T.List[str], pd.DataFrame]:
         """Validate user uploaded file and return uploaded validated data.
 
         Args:
@@ -347,44 +382,54 @@ class ClassifiersTrainingFile(ClassifierRelatedResource):
 
         Returns:
             table_headers: A list of length 2.
-            table_data: A list of lists of length 2.
+            table_df: A DataFrame with two columns, labeled 0 and 1.
         """
         # TODO: Write tests for all of these!
 
-        table = utils.Validate.spreadsheet_and_get_table(file_)
+        df = utils.Validate.spreadsheet_and_get_df(file_)
 
-        utils.Validate.table_has_no_empty_cells(table)
-        utils.Validate.table_has_num_columns(table, 2)
-        utils.Validate.table_has_headers(
-            table, [Settings.CONTENT_COL, Settings.LABEL_COL]
-        )
+        utils.Validate.df_has_no_empty_cells(df)
+        utils.Validate.df_has_num_columns(df, 2)
+        utils.Validate.df_has_headers(df, [Settings.CONTENT_COL, Settings.LABEL_COL])
 
-        table_headers, table_data = table[0], table[1:]
+        table_headers: T.List[str] = df.iloc[0].tolist()
+        table_df = df.iloc[1:].reset_index(drop=True)
 
-        min_num_examples = int(len(table_data) * Settings.TEST_SET_SPLIT)
-        if len(table_data) < min_num_examples:
+        min_num_examples = int(len(table_df) * Settings.TEST_SET_SPLIT)
+        if len(table_df) < min_num_examples:
             raise BadRequest(
                 f"We need at least {min_num_examples} labelled examples for this issue."
             )
 
-        # TODO: Low priority: Make this more efficient.
-        category_names_counter = Counter(category for _, category in table_data)
+        category_counts = table_df[1].value_counts()
 
-        unique_category_names = category_names_counter.keys()
-        if set(category_names) != unique_category_names:
+        expected_category_names = frozenset(category_names)
+        uploaded_category_names = frozenset(category_counts.index)
+        if expected_category_names != uploaded_category_names:
             # TODO: Lower case category names before checking.
-            # TODO: More helpful error messages when there is an error with the
-            # the categories in an uploaded training file.
-            raise UnprocessableEntity(
-                "The categories for this classifier are"
-                f" {category_names}. But the uploaded file either"
-                " has some categories missing, or has categories in addition to the"
-                " ones indicated."
+            message = (
+                f"The categories for this classifier are {category_names}, but they"
+                " don't match the ones in the uploaded file."
             )
+            missing_category_names = expected_category_names - uploaded_category_names
+            if missing_category_names:
+                message += (
+                    " The file is missing the categories: "
+                    + ", ".join(sorted(missing_category_names))
+                    + "."
+                )
+            extra_category_names = uploaded_category_names - expected_category_names
+            if extra_category_names:
+                message += (
+                    " The file has categories in addition to the ones indicated: "
+                    + ", ".join(sorted(extra_category_names))
+                    + "."
+                )
+            raise UnprocessableEntity(message)
 
-        categories_with_less_than_two_exs = [
-            category for category, count in category_names_counter.items() if count < 2
-        ]
+        categories_with_less_than_two_exs: T.List[str] = category_counts.index[
+            category_counts.to_numpy() < 2
+        ].tolist()
         if categories_with_less_than_two_exs:
             raise UnprocessableEntity(
                 "There are less than two examples with the categories: "
@@ -392,7 +437,21 @@ class ClassifiersTrainingFile(ClassifierRelatedResource):
                 " We need at least two examples per category."
             )
 
-        return table_headers, table_data
+        # The worker does a stratified split (modeling.classifier.split_labeled_file()),
+        # which needs at least one example of every category in both splits. The
+        # sizes are computed the way sklearn's StratifiedShuffleSplit computes them.
+        num_dev_examples = math.ceil(len(table_df) * Settings.TEST_SET_SPLIT)
+        num_train_examples = len(table_df) - num_dev_examples
+        if min(num_dev_examples, num_train_examples) < len(category_counts):
+            raise UnprocessableEntity(
+                f"{round(Settings.TEST_SET_SPLIT * 100)}% of the labelled examples are"
+                " set aside to evaluate the classifier, and the rest are used to"
+                " train it. Both of those need at least one example per category,"
+                f" but that's not possible with {len(table_df)} examples and"
+                f" {len(category_counts)} categories. Please upload more examples."
+            )
+
+        return table_headers, table_df
 
 
 class ClassifierTestSetStatusJson(TypedDict):
@@ -442,18 +501,16 @@ class ClassifiersTestSets(ClassifierTestSetRelatedResource):
 
     url = "/classifiers/<int:classifier_id>/test_sets/"
 
-    def __init__(self) -> None:
-        """Set up request parser."""
-        self.reqparse = reqparse.RequestParser()
-        self.reqparse.add_argument(
-            name="test_set_name", type=str, required=True, location="json"
-        )
-        self.reqparse.add_argument(
-            name="notify_at_email",
-            type=self._validate_email,
-            required=True,
-            location="json",
-        )
+    reqparse = reqparse.RequestParser()
+    reqparse.add_argument(
+        name="test_set_name", type=str, required=True, location="json"
+    )
+    reqparse.add_argument(
+        name="notify_at_email",
+        type=BaseResource._validate_email,
+        required=True,
+        location="json",
+    )
 
     def get(self, classifier_id: int) -> T.List[ClassifierTestSetStatusJson]:
         clsf = get_object_or_404(
@@ -499,9 +556,9 @@ class ClassifiersTestSetsPredictions(
 ):
     url = "/classifiers/<int:classifier_id>/test_sets/<int:test_set_id>/predictions"
 
-    def __init__(self) -> None:
-        self.reqparse = reqparse.RequestParser()
-        SupportSpreadsheetFileType.__init__(self)
+    reqparse = SupportSpreadsheetFileType._add_file_type_argument(
+        reqparse.RequestParser()
+    )
 
     def get(self, classifier_id: int, test_set_id: int) -> Response:
         test_set = get_object_or_404(models.TestSet, models.TestSet.id_ == test_set_id)
@@ -539,12 +596,10 @@ class ClassifiersTestSetsFile(ClassifierTestSetRelatedResource):
 
     url = "/classifiers/<int:classifier_id>/test_sets/<int:test_set_id>/file"
 
-    def __init__(self) -> None:
-        """Set up request parser."""
-        self.reqparse = reqparse.RequestParser()
-        self.reqparse.add_argument(
-            name="file", type=FileStorage, required=True, location="files"
-        )
+    reqparse = reqparse.RequestParser()
+    reqparse.add_argument(
+        name="file", type=FileStorage, required=True, location="files"
+    )
 
     def post(self, classifier_id: int, test_set_id: int) -> ClassifierTestSetStatusJson:
         """Upload a training set for classifier, and start training.
@@ -569,10 +624,11 @@ class ClassifiersTestSetsFile(ClassifierTestSetRelatedResource):
         if test_set.inference_began:
             raise AlreadyExists("The file for this test set has already been uploaded.")
 
-        table_headers, table_data = self._validate_test_file_and_get_data(file_)
+        table_headers, table_df = self._validate_test_file_and_get_data(file_)
+        file_.close()
 
         test_file = utils.Files.classifier_test_set_file(classifier_id, test_set_id)
-        self._write_headers_and_data_to_csv(table_headers, table_data, test_file)
+        self._write_headers_and_data_to_csv(table_headers, table_df, test_file)
 
         test_set.inference_began = True
         test_set.save()
@@ -600,7 +656,7 @@ class ClassifiersTestSetsFile(ClassifierTestSetRelatedResource):
     @staticmethod
     def _validate_test_file_and_get_data(
         file_: FileStorage,
-    ) -> T.Tuple[T.List[str], T.List[T.List[str]]]:
+    ) -> T.Tuple[T.List[str], pd.DataFrame]:
         """Validate user uploaded file and return validated data.
 
         Args:
@@ -608,24 +664,25 @@ class ClassifiersTestSetsFile(ClassifierTestSetRelatedResource):
             category_names: The categories for the classifier.
 
         Returns:
-            table_headers: A list of length 2.
-            table_data: A list of lists of length 2.
+            table_headers: A list of length 1.
+            table_df: A DataFrame with one column, labeled 0.
         """
 
-        table = utils.Validate.spreadsheet_and_get_table(file_)
+        df = utils.Validate.spreadsheet_and_get_df(file_)
 
-        utils.Validate.table_has_no_empty_cells(table)
-        utils.Validate.table_has_num_columns(table, 1)
-        utils.Validate.table_has_headers(table, [Settings.CONTENT_COL])
-        table_headers, table_data = table[0], table[1:]
+        utils.Validate.df_has_no_empty_cells(df)
+        utils.Validate.df_has_num_columns(df, 1)
+        utils.Validate.df_has_headers(df, [Settings.CONTENT_COL])
+        table_headers: T.List[str] = df.iloc[0].tolist()
+        table_df = df.iloc[1:].reset_index(drop=True)
 
         min_num_examples = 1
-        if len(table_data) < min_num_examples:
+        if len(table_df) < min_num_examples:
             raise BadRequest(
                 f"We need at least {min_num_examples} examples to run prediction on."
             )
 
-        return table_headers, table_data
+        return table_headers, table_df
 
 
 class TopicModelStatusJson(TypedDict):
@@ -730,32 +787,23 @@ class TopicModels(TopicModelRelatedResource):
 
     url = "/topic_models/"
 
-    def __init__(self) -> None:
-        """Set up request parser."""
-        self.reqparse = reqparse.RequestParser()
-        self.reqparse.add_argument(
-            name="topic_model_name", type=str, required=True, location="json"
-        )
-
-        def greater_than_1(x: T.Any) -> int:
-            int_x = int(x)
-            if int_x <= 1:
-                raise ValueError("Must be greater than 1")
-            return int_x
-
-        self.reqparse.add_argument(
-            name="num_topics",
-            type=greater_than_1,
-            required=True,
-            location="json",
-            help="The number of topics must be an integer greater than 1.",
-        )
-        self.reqparse.add_argument(
-            name="notify_at_email",
-            type=self._validate_email,
-            required=True,
-            location="json",
-        )
+    reqparse = reqparse.RequestParser()
+    reqparse.add_argument(
+        name="topic_model_name", type=str, required=True, location="json"
+    )
+    reqparse.add_argument(
+        name="num_topics",
+        type=BaseResource._validate_greater_than_1,
+        required=True,
+        location="json",
+        help="The number of topics must be an integer greater than 1.",
+    )
+    reqparse.add_argument(
+        name="notify_at_email",
+        type=BaseResource._validate_email,
+        required=True,
+        location="json",
+    )
 
     def post(self) -> TopicModelStatusJson:
         """Create a classifier."""
@@ -783,12 +831,10 @@ class TopicModelsTrainingFile(TopicModelRelatedResource):
 
     url = "/topic_models/<int:id_>/training/file"
 
-    def __init__(self) -> None:
-        """Set up request parser."""
-        self.reqparse = reqparse.RequestParser()
-        self.reqparse.add_argument(
-            name="file", type=FileStorage, required=True, location="files"
-        )
+    reqparse = reqparse.RequestParser()
+    reqparse.add_argument(
+        name="file", type=FileStorage, required=True, location="files"
+    )
 
     def post(self, id_: int) -> TopicModelStatusJson:
         args = self.reqparse.parse_args()
@@ -802,11 +848,11 @@ class TopicModelsTrainingFile(TopicModelRelatedResource):
         if topic_mdl.lda_set is not None:
             raise AlreadyExists("This topic model already has a training set.")
 
-        table_headers, table_data = self._validate_and_get_training_file(file_)
+        table_headers, table_df = self._validate_and_get_training_file(file_)
         file_.close()
 
         train_file = utils.Files.topic_model_training_file(id_)
-        self._write_headers_and_data_to_csv(table_headers, table_data, train_file)
+        self._write_headers_and_data_to_csv(table_headers, table_df, train_file)
 
         queue_manager: QueueManager = current_app.queue_manager
 
@@ -818,19 +864,17 @@ class TopicModelsTrainingFile(TopicModelRelatedResource):
             fname_topics_by_doc=str(utils.Files.topic_model_topics_by_doc_file(id_)),
             mallet_bin_directory=str(Settings.MALLET_BIN_DIRECTORY),
         )
-        topic_mdl.lda_set = models.LDASet()
-        topic_mdl.lda_set.save()
-        topic_mdl.save()
-
-        # Refresh classifier
-        topic_mdl = models.TopicModel.get(models.TopicModel.id_ == id_)
+        with models.database_proxy.atomic():
+            topic_mdl.lda_set = models.LDASet()
+            topic_mdl.lda_set.save()
+            topic_mdl.save()
 
         return self._topic_model_status_json(topic_mdl)
 
     @staticmethod
     def _validate_and_get_training_file(
         file_: FileStorage,
-    ) -> T.Tuple[T.List[str], T.List[T.List[str]]]:
+    ) -> T.Tuple[T.List[str], pd.DataFrame]:
         """Validate user input and return uploaded CSV data.
 
         Args:
@@ -838,44 +882,42 @@ class TopicModelsTrainingFile(TopicModelRelatedResource):
 
         Returns:
             table_headers: A list of length 2.
-            table_data: A list of lists of length 2.
+            table_df: A DataFrame with two columns, labeled 0 and 1.
         """
         # TODO: Write tests for all of these!
 
-        table = utils.Validate.spreadsheet_and_get_table(file_)
+        df = utils.Validate.spreadsheet_and_get_df(file_)
 
-        utils.Validate.table_has_num_columns(table, 1)
-        utils.Validate.table_has_headers(table, [Settings.CONTENT_COL])
-        utils.Validate.table_has_no_empty_cells(table)
+        utils.Validate.df_has_num_columns(df, 1)
+        utils.Validate.df_has_headers(df, [Settings.CONTENT_COL])
+        utils.Validate.df_has_no_empty_cells(df)
 
-        table_headers, table_data = table[0], table[1:]
+        content = df[0].iloc[1:].to_numpy()
         # Add the ID column to the table
-        table_headers = [Settings.ID_COL] + table_headers
-        table_data = [[str(row_num)] + row for row_num, row in enumerate(table_data)]
+        table_headers = [Settings.ID_COL, df.iat[0, 0]]
+        table_df = pd.DataFrame({0: np.arange(len(content)).astype(str), 1: content})
 
-        if len(table_data) < Settings.MINIMUM_LDA_EXAMPLES:
+        if len(table_df) < Settings.MINIMUM_LDA_EXAMPLES:
             raise BadRequest(
                 f"We need at least {Settings.MINIMUM_LDA_EXAMPLES} for a topic model."
             )
 
-        return table_headers, table_data
+        return table_headers, table_df
 
 
 class TopicModelsTopicsNames(TopicModelRelatedResource):
 
     url = "/topic_models/<int:id_>/topics/names"
 
-    def __init__(self) -> None:
-        self.reqparse = reqparse.RequestParser()
-
-        self.reqparse.add_argument(
-            name="topic_names",
-            type=self._validate_serializable_list_value,
-            action="append",
-            required=True,
-            location="json",
-            help="",
-        )
+    reqparse = reqparse.RequestParser()
+    reqparse.add_argument(
+        name="topic_names",
+        type=BaseResource._validate_serializable_list_value,
+        action="append",
+        required=True,
+        location="json",
+        help="",
+    )
 
     def post(self, id_: int) -> TopicModelStatusJson:
         args = self.reqparse.parse_args()
@@ -982,9 +1024,9 @@ class TopicModelsTopicsPreview(TopicModelRelatedResource):
 class TopicModelsKeywords(TopicModelRelatedResource, SupportSpreadsheetFileType):
     url = "/topic_models/<int:topic_model_id>/keywords"
 
-    def __init__(self) -> None:
-        self.reqparse = reqparse.RequestParser()
-        SupportSpreadsheetFileType.__init__(self)
+    reqparse = SupportSpreadsheetFileType._add_file_type_argument(
+        reqparse.RequestParser()
+    )
 
     def get(self, topic_model_id: int) -> Response:
         topic_mdl = get_object_or_404(
@@ -1039,9 +1081,9 @@ class TopicModelsKeywords(TopicModelRelatedResource, SupportSpreadsheetFileType)
 class TopicModelsTopicsByDoc(TopicModelRelatedResource, SupportSpreadsheetFileType):
     url = "/topic_models/<int:topic_model_id>/topics_by_doc"
 
-    def __init__(self) -> None:
-        self.reqparse = reqparse.RequestParser()
-        SupportSpreadsheetFileType.__init__(self)
+    reqparse = SupportSpreadsheetFileType._add_file_type_argument(
+        reqparse.RequestParser()
+    )
 
     def get(self, topic_model_id: int) -> Response:
         topic_mdl = get_object_or_404(
@@ -1117,6 +1159,22 @@ class TopicModelsTopicsByDoc(TopicModelRelatedResource, SupportSpreadsheetFileTy
         return topics_by_doc_file_with_topic_names
 
 
+def output_json(
+    data: utils.Json, code: int, headers: T.Optional[T.Dict[str, str]] = None
+) -> Response:
+    """Serialize API responses with orjson, which is a lot faster than the json module.
+
+    Replaces flask_restful.representations.json.output_json.
+    """
+    resp = make_response(orjson.dumps(data), code)
+    resp.headers.extend(headers or {})
+    return resp
+
+
+# Endpoints that never query the database. Every API resource does.
+_ENDPOINTS_WITHOUT_DB: TT.Final = frozenset({"static"})
+
+
 # We will initialize database manually in here, so we are not going to do
 # db.may_need_database_init
 @needs_settings_init()
@@ -1139,23 +1197,35 @@ def create_app(logging_level: int = logging.WARNING) -> Flask:
 
     app.config["SERVER_NAME"] = Settings.SERVER_NAME
 
+    # Compress JSON responses for clients that accept it.
+    Compress(app)
+
     # Create project root if necessary
     if not Settings.PROJECT_DATA_DIRECTORY.exists():
         Settings.PROJECT_DATA_DIRECTORY.mkdir()
-        utils.Files.supervised_dir(ensure_exists=True)
-        utils.Files.unsupervised_dir(ensure_exists=True)
+    # utils.Files doesn't check that these exist when building paths anymore.
+    utils.Files.supervised_dir(ensure_exists=True)
+    utils.Files.unsupervised_dir(ensure_exists=True)
 
     Version.ensure_project_data_dir_version_safe()
 
+    # Requests get their connection from this pool, and give it back at the end,
+    # instead of opening and closing one every time.
+    # check_same_thread=False is necessary because a connection can be handed to a
+    # different thread than the one that opened it.
+    database = PooledSqliteDatabase(
+        str(Settings.DATABASE_FILE),
+        max_connections=8,
+        stale_timeout=300,
+        check_same_thread=False,
+    )
     # Create database tables if the SQLITE file is going to be new
     if not Settings.DATABASE_FILE.exists():
-        database = pw.SqliteDatabase(str(Settings.DATABASE_FILE))
         models.database_proxy.initialize(database)
         with models.database_proxy.connection_context():
             logger.info("Created tables because SQLITE file was not found.")
             models.database_proxy.create_tables(models.MODELS)
     else:
-        database = pw.SqliteDatabase(str(Settings.DATABASE_FILE))
         models.database_proxy.initialize(database)
         logger.info("SQLITE file found. Not creating tables")
 
@@ -1163,16 +1233,22 @@ def create_app(logging_level: int = logging.WARNING) -> Flask:
 
     @app.before_request
     def _db_connect() -> None:
-        """Ensures that a connection is opened to handle queries by the request."""
+        """Ensures that a connection is opened to handle queries by the request.
+
+        Static files, and requests that didn't match any endpoint, don't need one.
+        """
+        if request.endpoint is None or request.endpoint in _ENDPOINTS_WITHOUT_DB:
+            return
         models.database_proxy.connect(reuse_if_open=True)
 
     @app.teardown_request
     def _db_close(exc: T.Optional[Exception]) -> None:
-        """Close on tear down."""
+        """Return the connection to the pool on tear down."""
         if not models.database_proxy.is_closed():
             models.database_proxy.close()
 
     api = Api(app)
+    api.representation("application/json")(output_json)
 
     # Add commands
     database_commands.add_commands_to_app(app)
@@ -5,6 +5,7 @@ import typing as T
 import numpy as np  # type: ignore
 import pandas as pd  # type: ignore
 import typing_extensions as TT
+from sklearn import model_selection  # type: ignore
 from sklearn.metrics import classification_report  # type: ignore
 from torch.utils.data.dataset import Dataset
 from transformers import AutoConfig
@@ -32,6 +33,28 @@ ClassifierMetricsJson = TT.TypedDict(
 )
 
 
+def split_labeled_file(
+    labeled_file: str, train_file: str, dev_file: str, test_size: float
+) -> None:
+    """Do a stratified split of a labeled CSV file into a train and a dev CSV file.
+
+    Args:
+        labeled_file: A CSV file with a header row, where the second column is the
+            category.
+        train_file: Where to write the train split.
+        dev_file: Where to write the dev split.
+        test_size: Proportion of examples to put in the dev split.
+    """
+    df = pd.read_csv(labeled_file, dtype=object, na_filter=False)
+    arr = df.to_numpy(dtype=object)
+    ss = model_selection.StratifiedShuffleSplit(n_splits=1, test_size=test_size)
+    X, y = arr[:, 0], arr[:, 1]
+    train_indices, dev_indices = next(ss.split(X, y))
+
+    df.iloc[train_indices].to_csv(train_file, index=False)
+    df.iloc[dev_indices].to_csv(dev_file, index=False)
+
+
 class ClassificationDataset(Dataset):  # type: ignore
     """Inherits from Torch dataset. Loads and holds tokenized data for a BERT model."""
 
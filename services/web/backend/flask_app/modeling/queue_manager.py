@@ -29,6 +29,7 @@ class ClassifierTrainingTaskArgs(TT.TypedDict):
     model_path: str
     cache_dir: str
     num_train_epochs: float
+    labeled_file: str
     train_file: str
     dev_file: str
     output_dir: str
@@ -48,18 +49,30 @@ class QueueManager(object):
     def __init__(self) -> None:
         connection = Redis(host=Settings.REDIS_HOST, port=Settings.REDIS_PORT)
         is_async = True
+        # The classifiers worker listens to "classifiers_prediction" before
+        # "classifiers", so that predictions, which are short, don't wait behind
+        # trainings that were queued before them.
+        self.classifiers_prediction_queue = Queue(
+            name="classifiers_prediction", connection=connection, is_async=is_async
+        )
         self.classifiers_queue = Queue(
             name="classifiers", connection=connection, is_async=is_async
         )
         self.topic_models_queue = Queue(
             name="topic_models", connection=connection, is_async=is_async
         )
+        # Both workers listen to this queue last, so that sending an email never
+        # delays training or prediction.
+        self.emails_queue = Queue(
+            name="emails", connection=connection, is_async=is_async
+        )
 
     def add_classifier_training(
         self,
         classifier_id: int,
         labels: T.List[str],
         model_path: str,
+        labeled_file: str,
         train_file: str,
         dev_file: str,
         cache_dir: str,
@@ -76,6 +89,7 @@ class QueueManager(object):
                 num_train_epochs=num_train_epochs,
                 labels=labels,
                 model_path=model_path,
+                labeled_file=labeled_file,
                 train_file=train_file,
                 dev_file=dev_file,
                 cache_dir=cache_dir,
@@ -94,8 +108,8 @@ class QueueManager(object):
         test_output_file: str,
     ) -> None:
 
-        logger.info("Enqueued classifier training.")
-        self.classifiers_queue.enqueue(
+        logger.info("Enqueued classifier prediction.")
+        self.classifiers_prediction_queue.enqueue(
             "flask_app.modeling.tasks.do_classifier_related_task",
             ClassifierPredictionTaskArgs(
                 test_set_id=test_set_id,
@@ -132,3 +146,59 @@ class QueueManager(object):
             ),
             job_timeout=-1,
         )
+
+    @T.overload
+    def add_email(
+        self,
+        email_template_name: TT.Literal["classifier_training_finished"],
+        to_email: str,
+        *,
+        classifier_name: str,
+        metrics: T.Dict[str, T.Union[float, int]],
+    ) -> None:
+        ...
+
+    @T.overload
+    def add_email(
+        self,
+        email_template_name: TT.Literal["classifier_inference_finished"],
+        to_email: str,
+        *,
+        classifier_name: str,
+        predictions_url: str,
+    ) -> None:
+        ...
+
+    @T.overload
+    def add_email(
+        self,
+        email_template_name: TT.Literal["topic_model_training_finished"],
+        to_email: str,
+        *,
+        topic_model_name: str,
+        topic_model_preview_url: str,
+        metrics: T.Dict[str, T.Union[float, int]],
+    ) -> None:
+        ...
+
+    def add_email(
+        self,
+        email_template_name: TT.Literal[
+            "classifier_inference_finished",
+            "topic_model_training_finished",
+            "classifier_training_finished",
+        ],
+        to_email: str,
+        **template_values: T.Union[str, T.Dict[str, T.Union[float, int]]],
+    ) -> None:
+        """Enqueue an email. Takes the same arguments as emails.Emailer.send_email()."""
+        logger.info(f"Enqueued {email_template_name} email.")
+
+        self.emails_queue.enqueue(
+            "flask_app.modeling.tasks.send_email_task",
+            kwargs=dict(
+                email_template_name=email_template_name,
+                to_email=to_email,
+                **template_values,
+            ),
+        )
@@ -6,19 +6,24 @@ a cyclic import.
 The functions within are referred with qualified "Python paths"
 (eg., "flask_app.modeling.tasks.do_classifier_related_task"). Rq supports that.
 """
+import functools
 import logging
 import typing as T
 
+import typing_extensions as TT
+from flask import current_app
 from flask import url_for
 
 import flask_app
 from flask_app import emails
 from flask_app.database import models
 from flask_app.modeling.classifier import ClassifierModel
+from flask_app.modeling.classifier import split_labeled_file
 from flask_app.modeling.lda import Corpus
 from flask_app.modeling.lda import LDAModeler
 from flask_app.modeling.queue_manager import ClassifierPredictionTaskArgs
 from flask_app.modeling.queue_manager import ClassifierTrainingTaskArgs
+from flask_app.modeling.queue_manager import QueueManager
 from flask_app.modeling.queue_manager import TopicModelTrainingTaskArgs
 from flask_app.settings import Settings
 
@@ -27,6 +32,25 @@ logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
 
+@functools.lru_cache(maxsize=4)
+def _get_classifier_model_for_prediction(
+    labels: T.Tuple[str, ...], model_path: str, cache_dir: str
+) -> ClassifierModel:
+    """Load a trained classifier, reusing it if it was loaded by an earlier prediction.
+
+    Classifiers used for training are not cached, since training modifies them. The
+    cache is cleared before training, and after a failed prediction(which might have
+    failed because we ran out of memory), so that the memory goes to the job at hand.
+
+    The cache only lives as long as the process. That's why the classifiers worker is
+    a rq.SimpleWorker(look at docker-compose.yml), which runs jobs in its own
+    process, instead of forking a new one for every job.
+    """
+    return ClassifierModel(
+        labels=list(labels), model_path=model_path, cache_dir=cache_dir
+    )
+
+
 @flask_app.app.needs_app_context
 def do_classifier_related_task(
     task_args: T.Union[ClassifierTrainingTaskArgs, ClassifierPredictionTaskArgs],
@@ -37,8 +61,8 @@ def do_classifier_related_task(
         assert not test_set.inference_completed
 
         try:
-            classifier_model = ClassifierModel(
-                labels=task_args["labels"],
+            classifier_model = _get_classifier_model_for_prediction(
+                labels=tuple(task_args["labels"]),
                 model_path=task_args["model_path"],
                 cache_dir=task_args["cache_dir"],
             )
@@ -51,11 +75,12 @@ def do_classifier_related_task(
             )
         except BaseException as e:
             logger.critical(f"Error while doing prediction task: {e}")
+            _get_classifier_model_for_prediction.cache_clear()
             test_set.error_encountered = True
         else:
             test_set.inference_completed = True
-            emailer = emails.Emailer()
-            emailer.send_email(
+            queue_manager: QueueManager = current_app.queue_manager
+            queue_manager.add_email(
                 email_template_name="classifier_inference_finished",
                 to_email=test_set.notify_at_email,
                 classifier_name=test_set.classifier.name,
@@ -78,7 +103,15 @@ def do_classifier_related_task(
         assert clsf.train_set is not None
         assert clsf.dev_set is not None
 
+        # Don't train next to the classifiers cached for prediction.
+        _get_classifier_model_for_prediction.cache_clear()
         try:
+            split_labeled_file(
+                labeled_file=task_args["labeled_file"],
+                train_file=task_args["train_file"],
+                dev_file=task_args["dev_file"],
+                test_size=Settings.TEST_SET_SPLIT,
+            )
             classifier_model = ClassifierModel(
                 labels=task_args["labels"],
                 num_train_epochs=task_args["num_train_epochs"],
@@ -98,8 +131,8 @@ def do_classifier_related_task(
             clsf.dev_set.training_or_inference_completed = True
             clsf.dev_set.metrics = models.ClassifierMetrics(**metrics)
             clsf.dev_set.metrics.save()
-            emailer = emails.Emailer()
-            emailer.send_email(
+            queue_manager = current_app.queue_manager
+            queue_manager.add_email(
                 email_template_name="classifier_training_finished",
                 to_email=clsf.notify_at_email,
                 classifier_name=clsf.name,
@@ -141,8 +174,8 @@ def do_topic_model_related_task(task_args: TopicModelTrainingTaskArgs) -> None:
         )
         topic_mdl.lda_set.metrics = models.TopicModelMetrics.create(**metrics)
         topic_mdl.lda_set.lda_completed = True
-        emailer = emails.Emailer()
-        emailer.send_email(
+        queue_manager: QueueManager = current_app.queue_manager
+        queue_manager.add_email(
             email_template_name="topic_model_training_finished",
             to_email=topic_mdl.notify_at_email,
             topic_model_name=topic_mdl.name,
@@ -152,3 +185,22 @@ def do_topic_model_related_task(task_args: TopicModelTrainingTaskArgs) -> None:
 
     finally:
         topic_mdl.lda_set.save()
+
+
+def send_email_task(
+    email_template_name: TT.Literal[
+        "classifier_inference_finished",
+        "topic_model_training_finished",
+        "classifier_training_finished",
+    ],
+    to_email: str,
+    **template_values: T.Union[str, T.Dict[str, T.Union[float, int]]],
+) -> None:
+    """Send an email enqueued by QueueManager.add_email().
+
+    The overloads of QueueManager.add_email() have already type checked the arguments.
+    They can't be matched against the overloads of Emailer.send_email() again from
+    here, so the call goes through T.Any.
+    """
+    emailer = emails.Emailer()
+    T.cast(T.Any, emailer).send_email(email_template_name, to_email, **template_values)
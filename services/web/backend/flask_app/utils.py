@@ -1,7 +1,5 @@
 """Everything that is not dealing with HTTP and that doesn't belong in modeling/."""
-import csv
 import hashlib
-import io
 import mimetypes
 import typing as T
 from pathlib import Path
@@ -19,10 +17,16 @@ Json = T.Optional[T.Union[T.List[T.Any], T.Dict[str, T.Any], int, str, bool]]
 
 
 class Files:
-    """A class for defining where files will be stored."""
+    """A class for defining where files will be stored.
+
+    None of the methods here touch the file system unless ensure_exists=True is
+    passed. create_app() ensures supervised_dir() and unsupervised_dir() exist, and
+    the resources that create a classifier, topic model, etc. ensure their
+    directories exist.
+    """
 
     @classmethod
-    def supervised_dir(cls, ensure_exists: bool = True) -> Path:
+    def supervised_dir(cls, ensure_exists: bool = False) -> Path:
         """Dir for classifier weights, training and inference data."""
         dir_ = Settings.PROJECT_DATA_DIRECTORY / "supervised"
         if ensure_exists:
@@ -30,7 +34,7 @@ class Files:
         return dir_
 
     @classmethod
-    def unsupervised_dir(cls, ensure_exists: bool = True) -> Path:
+    def unsupervised_dir(cls, ensure_exists: bool = False) -> Path:
         """Dir for LDA results, training and inference data."""
         dir_ = Settings.PROJECT_DATA_DIRECTORY / "unsupervised"
         if ensure_exists:
@@ -45,6 +49,11 @@ class Files:
             cls._create_dir_if_not_exists(dir_)
         return dir_
 
+    @classmethod
+    def classifier_labeled_set_file(cls, classifier_id: int) -> Path:
+        """CSV file uploaded by the user, later split into the train and dev files."""
+        return cls.classifier_dir(classifier_id) / "labeled.csv"
+
     @classmethod
     def classifier_train_set_file(cls, classifier_id: int) -> Path:
         """CSV training file for classifier."""
@@ -57,7 +66,7 @@ class Files:
 
     @classmethod
     def classifier_output_dir(
-        cls, classifier_id: int, ensure_exists: bool = True
+        cls, classifier_id: int, ensure_exists: bool = False
     ) -> Path:
         """Trained model output dir"""
         dir_ = cls.classifier_dir(classifier_id) / "trained_model/"
@@ -67,7 +76,7 @@ class Files:
 
     @classmethod
     def classifier_test_set_dir(
-        cls, classifier_id: int, test_set_id: int, ensure_exists: bool = True
+        cls, classifier_id: int, test_set_id: int, ensure_exists: bool = False
     ) -> Path:
         """Files related to one prediction set will be stored here"""
         dir_ = cls.classifier_dir(classifier_id) / f"prediction_set_{test_set_id}"
@@ -154,7 +163,7 @@ class Files:
 
 class Validate:
     @classmethod
-    def spreadsheet_and_get_table(cls, file_: FileStorage) -> T.List[T.List[str]]:
+    def spreadsheet_and_get_df(cls, file_: FileStorage) -> pd.DataFrame:
         """Check if file_ is a valid csv,xls, xlsx, xlsm, xlsb, or odf
             file and returns the contents.
 
@@ -165,7 +174,8 @@ class Validate:
             file_: A file object.
 
         Returns:
-            table: A list of list of strings.
+            df: A DataFrame of strings, without any header(ie, the header row is the
+                first row, and the columns are labeled 0, 1, ...).
 
         Raises:
             BadRequest:
@@ -191,21 +201,20 @@ class Validate:
                 raise BadRequest("The uploaded spreadsheet could not be parsed.")
             else:
                 df = df.astype(str)
-                table: T.List[T.List[str]] = df.to_numpy().tolist()  # type: ignore
         elif file_type in [".csv", ".txt"]:
             try:
                 # TODO: Check if the file size is too large
-                text_stream = io.TextIOWrapper(T.cast(io.BytesIO, file_))
-                table = list(csv.reader(text_stream))
+                df = pd.read_csv(
+                    file_, dtype=str, header=None, na_filter=False, engine="c"
+                )
+            except pd.errors.EmptyDataError:
+                raise BadRequest("An empty file was uploaded.")
             except Exception as e:
                 current_app.logger.info(f"Invalid CSV file: {e}")
                 raise BadRequest("Uploaded text file is not in valid CSV format.")
             else:
-                if table == []:
-                    raise BadRequest("An empty file was uploaded.")
                 # strip blanks
-                table = [[cell.strip() for cell in row] for row in table]
-                text_stream.close()
+                df = df.apply(lambda col: col.str.strip())
         else:
             raise BadRequest(
                 f"File type {file_type} was not understood as a valid spreadhseet type,"
@@ -213,39 +222,35 @@ class Validate:
                 + ", ".join(Settings.SUPPORTED_NON_CSV_FORMATS | {".csv"})
             )
 
-        return table
+        return df
 
     @classmethod
-    def table_has_headers(
-        cls, table: T.List[T.List[str]], headers: T.List[str]
-    ) -> None:
-        """Check if the "table"'s first row matches the headers provided, case insensitively.
+    def df_has_headers(cls, df: pd.DataFrame, headers: T.List[str]) -> None:
+        """Check if the first row matches the headers provided, case insensitively.
 
         Args:
-            table: A list of lists of strings.
+            df: A DataFrame from spreadsheet_and_get_df().
             headers: A list of strings.
 
         Raises:
             BadRequest:
         """
-        if not [h.lower() for h in table[0]] == [h.lower() for h in headers]:
+        df_headers = df.iloc[0].tolist()
+        if not [h.lower() for h in df_headers] == [h.lower() for h in headers]:
             raise BadRequest(
-                f"table has headers {table[0]}, but needs to have headers" f"{headers}"
+                f"table has headers {df_headers}, but needs to have headers {headers}"
             )
 
     @classmethod
-    def table_has_no_empty_cells(cls, table: T.List[T.List[str]]) -> None:
+    def df_has_no_empty_cells(cls, df: pd.DataFrame) -> None:
         """
 
-        Does not strip off blanks.(That's done in Validate.csv_and_get_table
+        Does not strip off blanks.(That's done in Validate.spreadsheet_and_get_df
 
         Raises:
             BadRequest:
         """
-        rows_with_empty_cells = []
-        for row_num, row in enumerate(table, start=1):
-            if any([cell == "" for cell in row]):
-                rows_with_empty_cells.append(row)
+        rows_with_empty_cells = df[(df == "").any(axis=1)].to_numpy().tolist()
         if rows_with_empty_cells:
             raise BadRequest(
                 "The following row numbers have empty cells: "
@@ -253,18 +258,17 @@ class Validate:
             )
 
     @classmethod
-    def table_has_num_columns(
-        cls, table: T.List[T.List[str]], num_columns: int
-    ) -> None:
-        """Check if the "table"'s first row matches the headers provided, case insensitively.
+    def df_has_num_columns(cls, df: pd.DataFrame, num_columns: int) -> None:
+        """Check if the DataFrame has the number of columns expected.
 
         Args:
-            table: A list of lists of strings.
+            df: A DataFrame.
             num_columns: The number of columns expected.
-        Returns:
-            is_valid:
+
+        Raises:
+            BadRequest:
         """
-        if not len(table[0]) == num_columns:
+        if not df.shape[1] == num_columns:
             raise BadRequest(
                 f"table must have {num_columns}"
                 + ("column." if num_columns == 1 else "columns.")
@@ -1,10 +1,14 @@
+import gzip
 import io
+import json
 import shutil
+import typing as T
 import unittest
 from unittest import mock
 
 import pandas as pd  # type: ignore
 from flask import current_app
+from flask import Response
 from flask import url_for
 from tests.common import AppMixin
 from tests.common import debug_on  # noqa: 401
@@ -17,6 +21,7 @@ from flask_app.app import API_URL_PREFIX
 from flask_app.app import ClassifierStatusJson
 from flask_app.app import ClassifierTestSetStatusJson
 from flask_app.database import models
+from flask_app.modeling import tasks
 from flask_app.modeling.queue_manager import QueueManager
 from flask_app.settings import Settings
 
@@ -66,6 +71,32 @@ class TestClassifiers(ClassifierMixin, unittest.TestCase):
             )
             self.assertDictEqual(clsf_status, dict(expected_classifier_status))
 
+    def test_get_with_and_without_compression(self) -> None:
+        # Flask-Compress leaves responses smaller than 500 bytes alone.
+        for i in range(10):
+            models.Classifier.create(
+                notify_at_email="davidat@bu.edu",
+                name=f"test_classifier_{i}",
+                category_names=["up", "down"],
+            )
+
+        url = API_URL_PREFIX + "/classifiers/"
+        with current_app.test_client() as client:
+            with self.subTest("without compression"):
+                resp = client.get(url)
+                self._assert_response_success(resp, url)
+                self.assertNotIn("Content-Encoding", resp.headers)
+                uncompressed_json = resp.get_json()
+                self.assertEqual(len(uncompressed_json), 11)
+
+            with self.subTest("with gzip compression"):
+                resp = client.get(url, headers={"Accept-Encoding": "gzip"})
+                self._assert_response_success(resp, url)
+                self.assertEqual(resp.headers["Content-Encoding"], "gzip")
+                self.assertEqual(
+                    json.loads(gzip.decompress(resp.data)), uncompressed_json
+                )
+
     def test_get_one_classifier(self) -> None:
         url = API_URL_PREFIX + f"/classifiers/{self._clsf.classifier_id}"
         with current_app.test_client() as client:
@@ -97,6 +128,9 @@ class TestClassifiers(ClassifierMixin, unittest.TestCase):
         file_ = io.BytesIO(self._valid_training_contents.encode())
         with current_app.test_client() as client:
             output_dir = utils.Files.classifier_output_dir(self._clsf.classifier_id)
+            labeled_set_file = utils.Files.classifier_labeled_set_file(
+                self._clsf.classifier_id
+            )
             dev_set_file = utils.Files.classifier_dev_set_file(self._clsf.classifier_id)
             train_set_file = utils.Files.classifier_train_set_file(
                 self._clsf.classifier_id
@@ -123,27 +157,27 @@ class TestClassifiers(ClassifierMixin, unittest.TestCase):
             classifier_id=self._clsf.classifier_id,
             labels=self._clsf.category_names,
             model_path=Settings.TRANSFORMERS_MODEL,
+            labeled_file=str(labeled_set_file),
             dev_file=str(dev_set_file),
             train_file=str(train_set_file),
             cache_dir=str(Settings.TRANSFORMERS_CACHE_DIRECTORY),
             output_dir=str(output_dir),
         )
 
-        # Assert files created
-        self.assertTrue(dev_set_file.exists())
-        self.assertTrue(train_set_file.exists())
+        # Assert file created. The worker splits it into train and dev.
+        self.assertTrue(labeled_set_file.exists())
 
 
 class TestClassifiersTrainingFile(ClassifierMixin):
     def setUp(self) -> None:
         """Setup an "untrained" classifier."""
         super().setUp()
-        dev_set_file = utils.Files.classifier_dev_set_file(self._clsf.classifier_id)
-        train_set_file = utils.Files.classifier_train_set_file(self._clsf.classifier_id)
+        labeled_set_file = utils.Files.classifier_labeled_set_file(
+            self._clsf.classifier_id
+        )
 
-        # Copy over the files
-        shutil.copy(TESTING_FILES_DIR / "classifiers" / "dev.csv", dev_set_file)
-        shutil.copy(TESTING_FILES_DIR / "classifiers" / "train.csv", train_set_file)
+        # Copy over the file
+        shutil.copy(TESTING_FILES_DIR / "classifiers" / "labeled.csv", labeled_set_file)
 
         # Update the database
         self._clsf.train_set = models.LabeledSet()
@@ -152,10 +186,60 @@ class TestClassifiersTrainingFile(ClassifierMixin):
         self._clsf.train_set.save()
         self._clsf.save()
 
+    def _post_training_file(
+        self, category_names: T.List[str], table: T.List[T.List[str]]
+    ) -> Response:
+        """Create another, untrained classifier and upload table as its training file."""
+        clsf = models.Classifier.create(
+            notify_at_email="davidat@bu.edu",
+            name="another_test_classifier",
+            category_names=category_names,
+        )
+        utils.Files.classifier_dir(clsf.classifier_id, ensure_exists=True)
+
+        test_url = API_URL_PREFIX + f"/classifiers/{clsf.classifier_id}/training/file"
+        with current_app.test_client() as client:
+            return client.post(
+                test_url, data={"file": (make_csv_file(table), "labeled.csv")}
+            )
+
+    def test_too_few_examples_to_split(self) -> None:
+        # Two examples per category is enough for each category on its own, but the
+        # dev set would only get two of the six examples, for three categories.
+        table = [[Settings.CONTENT_COL, Settings.LABEL_COL]] + [
+            [f"example {i} of {category}", category]
+            for category in ["a", "b", "c"]
+            for i in range(2)
+        ]
+        res = self._post_training_file(["a", "b", "c"], table)
+
+        self.assertEqual(res.status_code, 422)
+        self.assertIn("Please upload more examples.", res.get_json()["message"])
+
+    def test_mismatched_categories(self) -> None:
+        table = [[Settings.CONTENT_COL, Settings.LABEL_COL]] + [
+            [f"example {i} of {category}", category]
+            for category in ["a", "b", "d"]
+            for i in range(5)
+        ]
+        res = self._post_training_file(["a", "b", "c"], table)
+
+        self.assertEqual(res.status_code, 422)
+        self.assertEqual(
+            res.get_json()["message"],
+            "The categories for this classifier are ['a', 'b', 'c'], but they don't"
+            " match the ones in the uploaded file. The file is missing the"
+            " categories: c. The file has categories in addition to the ones"
+            " indicated: d.",
+        )
+
     def test_error_during_training(self) -> None:
         output_dir = utils.Files.classifier_output_dir(self._clsf.classifier_id)
         dev_set_file = utils.Files.classifier_dev_set_file(self._clsf.classifier_id)
         train_set_file = utils.Files.classifier_train_set_file(self._clsf.classifier_id)
+        labeled_set_file = utils.Files.classifier_labeled_set_file(
+            self._clsf.classifier_id
+        )
         # Perform training, also will modify the database to indicate that it was
         # trained
         queue_manager: QueueManager = current_app.queue_manager
@@ -167,6 +251,7 @@ class TestClassifiersTrainingFile(ClassifierMixin):
             classifier_id=self._clsf.classifier_id,
             labels=self._clsf.category_names,
             model_path=Settings.TRANSFORMERS_MODEL,
+            labeled_file=str(labeled_set_file),
             train_file=str(train_set_file / "SOMETHING THAT DOESNT EXIST"),
             dev_file=str(dev_set_file),
             cache_dir=str(Settings.TRANSFORMERS_CACHE_DIRECTORY),
@@ -194,6 +279,9 @@ class TestClassifiersTrainingFile(ClassifierMixin):
             train_set_file = utils.Files.classifier_train_set_file(
                 self._clsf.classifier_id
             )
+            labeled_set_file = utils.Files.classifier_labeled_set_file(
+                self._clsf.classifier_id
+            )
             # Perform training, also will modify the database to indicate that it was
             # trained
             queue_manager: QueueManager = current_app.queue_manager
@@ -201,6 +289,7 @@ class TestClassifiersTrainingFile(ClassifierMixin):
                 classifier_id=self._clsf.classifier_id,
                 labels=self._clsf.category_names,
                 model_path=Settings.TRANSFORMERS_MODEL,
+                labeled_file=str(labeled_set_file),
                 train_file=str(train_set_file),
                 dev_file=str(dev_set_file),
                 cache_dir=str(Settings.TRANSFORMERS_CACHE_DIRECTORY),
@@ -209,6 +298,8 @@ class TestClassifiersTrainingFile(ClassifierMixin):
             )
             # Do the queued work
             assert self._burst_workers("classifiers")
+            # Send the "training finished" email
+            self._assert_burst_workers_without_failures("emails")
 
             expected_classifier_status = ClassifierStatusJson(
                 classifier_id=self._clsf.classifier_id,
@@ -310,7 +401,9 @@ class TestClassifiersTrainingFile(ClassifierMixin):
                 self.assertTrue(test_set_file.exists())
 
             with self.subTest("do prediction task and complete test set"):
-                assert self._burst_workers("classifiers")
+                assert self._burst_workers("classifiers_prediction")
+                # Send the "inference finished" email
+                self._assert_burst_workers_without_failures("emails")
                 # Assert the test results
                 test_set_predictions_file = utils.Files.classifier_test_set_predictions_file(
                     self._clsf.classifier_id, created_test_set.id_
@@ -368,5 +461,27 @@ class TestClassifiersTrainingFile(ClassifierMixin):
         # and allow a unit test for when prediction task raises an Exception.
 
 
+class TestClassifierModelForPredictionCache(unittest.TestCase):
+    def setUp(self) -> None:
+        tasks._get_classifier_model_for_prediction.cache_clear()
+
+    def tearDown(self) -> None:
+        tasks._get_classifier_model_for_prediction.cache_clear()
+
+    def test_reused_between_predictions(self) -> None:
+        with mock.patch.object(tasks, "ClassifierModel") as classifier_model_cls:
+            first_model = tasks._get_classifier_model_for_prediction(
+                labels=("up", "down"), model_path="model_path", cache_dir="cache_dir"
+            )
+            second_model = tasks._get_classifier_model_for_prediction(
+                labels=("up", "down"), model_path="model_path", cache_dir="cache_dir"
+            )
+
+        self.assertIs(first_model, second_model)
+        classifier_model_cls.assert_called_once_with(
+            labels=["up", "down"], model_path="model_path", cache_dir="cache_dir"
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -232,6 +232,8 @@ class TestTopicModelsTrainingFile(TopicModelMixin, unittest.TestCase):
         )
 
         assert self._burst_workers("topic_models")
+        # Send the "topic model training finished" email
+        self._assert_burst_workers_without_failures("emails")
 
         with self.subTest("Test LDA file results are present"):
             self.assertTrue(fname_keywords.exists())
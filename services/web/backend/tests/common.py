@@ -148,3 +148,15 @@ class RQWorkerMixin(unittest.TestCase):
         queue = Queue(queue_name, connection=self._redis_conn)
         worker = Worker([queue], connection=self._redis_conn)
         return worker.work(burst=True)
+
+    def _assert_burst_workers_without_failures(self, queue_name: str) -> None:
+        """Like _burst_workers(), but check that there was work, and that none failed.
+
+        Used for queues whose jobs leave nothing else behind to check, like "emails".
+        """
+        failed_job_registry = Queue(
+            queue_name, connection=self._redis_conn
+        ).failed_job_registry
+        num_failed_before = failed_job_registry.count
+        self.assertTrue(self._burst_workers(queue_name))
+        self.assertEqual(failed_job_registry.count, num_failed_before)
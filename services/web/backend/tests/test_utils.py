@@ -2,6 +2,7 @@ import logging
 import mimetypes
 import unittest
 
+import pandas as pd  # type: ignore
 from flask import current_app
 from flask import request
 from tests.common import AppMixin
@@ -15,12 +16,26 @@ logger.setLevel(logging.DEBUG)
 
 
 class TestValidate(AppMixin):
-    def test_table_has_no_empty_cells(self) -> None:
+    def test_df_has_no_empty_cells(self) -> None:
         with self.assertRaises(BadRequest):
-            utils.Validate.table_has_no_empty_cells([["not empty"], [""]])
-        utils.Validate.table_has_no_empty_cells([["not empty"], ["also not empty"]])
+            utils.Validate.df_has_no_empty_cells(pd.DataFrame([["not empty"], [""]]))
+        utils.Validate.df_has_no_empty_cells(
+            pd.DataFrame([["not empty"], ["also not empty"]])
+        )
 
-    def test_validate_spreadsheet_and_get_table(self) -> None:
+    def test_df_has_num_columns(self) -> None:
+        df = pd.DataFrame([["Header_1", "Header_2"], ["a", "b"]])
+        with self.assertRaises(BadRequest):
+            utils.Validate.df_has_num_columns(df, 1)
+        utils.Validate.df_has_num_columns(df, 2)
+
+    def test_df_has_headers(self) -> None:
+        df = pd.DataFrame([["Header_1", "Header_2"], ["a", "b"]])
+        with self.assertRaises(BadRequest):
+            utils.Validate.df_has_headers(df, ["Header_1", "Header_3"])
+        utils.Validate.df_has_headers(df, ["header_1", "HEADER_2"])
+
+    def test_validate_spreadsheet_and_get_df(self) -> None:
         for file_path in (TESTING_FILES_DIR / "file_formats").iterdir():
             for mimetype in [mimetypes.guess_type(file_path)[0], None]:
                 with self.subTest(
@@ -34,11 +49,9 @@ class TestValidate(AppMixin):
                         uploaded_file = request.files["file"]
                         if file_path.stem == "valid":
                             logger.info(f"about to guess for {file_path}")
-                            table = utils.Validate.spreadsheet_and_get_table(
-                                uploaded_file
-                            )
+                            df = utils.Validate.spreadsheet_and_get_df(uploaded_file)
                             self.assertListEqual(
-                                table,
+                                df.to_numpy().tolist(),
                                 [
                                     ["Header_1", "Header_2"],
                                     ["Data_row_col_1", "Data_row_col_2"],
@@ -46,9 +59,7 @@ class TestValidate(AppMixin):
                             )
                         elif file_path.stem == "invalid":
                             with self.assertRaises(BadRequest):
-                                table = utils.Validate.spreadsheet_and_get_table(
-                                    uploaded_file
-                                )
+                                utils.Validate.spreadsheet_and_get_df(uploaded_file)
 
     def tearDown(self) -> None:
         super().tearDown()